@@ -15,12 +15,34 @@ THESAURUS_API_BASE_URL = (
 # Rate Limiting
 DAILY_API_CALL_LIMIT = 1000
 SAFE_CALL_LIMIT = 990  # Slightly under the limit to be safe
+# Merriam-Webster only publishes the daily limit, so the pacing just spreads
+# out the concurrent lookups; a full day's calls take under two minutes
+API_RATE_LIMIT = 10  # Maximum API calls per rate period
+API_RATE_PERIOD = 1  # Rate period in seconds
+MAX_RETRY_AFTER = 60  # Longest Retry-After delay waited out, in seconds
+
+# Concurrency
+MAX_CONCURRENT_WORDS = 64  # Words looked up at the same time
+# Both APIs share one host, and calls are paced by the rate limiter, so a
+# small pool of kept-alive connections avoids repeated TLS handshakes
+MAX_CONNECTIONS_PER_HOST = 16
+CONNECTION_KEEPALIVE_TIMEOUT = 60  # Seconds an idle connection is kept open
+
+# Logging
+PROGRESS_LOG_INTERVAL = 100  # Log progress once every this many words
 
 # Paths
 DATA_DIR = "data"
-DICTIONARY_DIR = os.path.join(DATA_DIR, "dictionary")
-THESAURUS_DIR = os.path.join(DATA_DIR, "thesaurus")
+DICTIONARY_PATH = os.path.join(DATA_DIR, "dictionary.jsonl")
+THESAURUS_PATH = os.path.join(DATA_DIR, "thesaurus.jsonl")
+PROGRESS_DB_PATH = os.path.join(DATA_DIR, "progress.db")  # Index of stored words
+# One file per word, as written by older versions
+LEGACY_DICTIONARY_DIR = os.path.join(DATA_DIR, "dictionary")
+LEGACY_THESAURUS_DIR = os.path.join(DATA_DIR, "thesaurus")
 SOURCE_DIR = "source"
 
+# Result Storage
+RESULT_CHECKPOINT_INTERVAL = 100  # Results saved between progress checkpoints
+
 # Word Processing
 MIN_WORD_LENGTH = 2  # Minimum length to be considered a word
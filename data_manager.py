@@ -1,21 +1,32 @@
 # Functions for managing data storage and retrieval
 
 import os
-import json
+import functools
 import logging
+import mmap
 import re
-from constants import DICTIONARY_DIR, THESAURUS_DIR
+import sqlite3
+import stat
 
-logger = logging.getLogger("scp_word_extractor")
+import orjson
 
+from constants import (
+    DATA_DIR,
+    DICTIONARY_PATH,
+    LEGACY_DICTIONARY_DIR,
+    LEGACY_THESAURUS_DIR,
+    PROGRESS_DB_PATH,
+    RESULT_CHECKPOINT_INTERVAL,
+    THESAURUS_PATH,
+)
 
-def ensure_data_directories():
-    """Create necessary data directories if they don't exist."""
-    os.makedirs(DICTIONARY_DIR, exist_ok=True)
-    os.makedirs(THESAURUS_DIR, exist_ok=True)
-    logger.info(f"Ensured data directories exist: {DICTIONARY_DIR}, {THESAURUS_DIR}")
+logger = logging.getLogger("scp_word_extractor")
+
+# Non-alphanumeric characters (except hyphen), replaced with underscores
+_SANITIZE_RE = re.compile(r"[^a-zA-Z0-9\-]")
 
 
+@functools.lru_cache(maxsize=None)
 def sanitize_filename(word):
     """
     Sanitize a word to be used as a filename.
@@ -26,72 +37,254 @@ def sanitize_filename(word):
     Returns:
         str: Sanitized filename-safe string
     """
-    # Replace non-alphanumeric characters (except hyphen) with underscore
-    return re.sub(r"[^a-zA-Z0-9\-]", "_", word)
+    return _SANITIZE_RE.sub("_", word)
+
+
+class _ResultShard:
+    """
+    Append-only JSONL file of API results with an in-memory index of words.
+
+    Stored words are tracked in the progress database, which records how much
+    of the file it covers. Records past that checkpoint, e.g. written just
+    before a crash, are replayed into the index when the shard is opened.
+    """
+
+    def __init__(self, kind, path, legacy_dir):
+        self.kind = kind
+        self.path = path
+        self.legacy_dir = legacy_dir
+        self.words = set()
+        self.legacy_names = frozenset()
+        self.file = None
+        self.progress = None
+
+    def open(self, progress):
+        """Load the words already stored and open the shard for appending."""
+        self.progress = progress
+        self.words = {
+            row[0]
+            for row in progress.execute(
+                "SELECT word FROM done WHERE kind = ?", (self.kind,)
+            )
+        }
+        row = progress.execute(
+            "SELECT size FROM checkpoints WHERE kind = ?", (self.kind,)
+        ).fetchone()
+        checkpoint = row[0] if row else 0
+
+        size = os.path.getsize(self.path) if os.path.exists(self.path) else 0
+        if size < checkpoint:
+            logger.warning(f"{self.path} is shorter than its checkpoint, reindexing")
+            progress.execute("DELETE FROM done WHERE kind = ?", (self.kind,))
+            self.words.clear()
+            checkpoint = 0
+
+        needs_newline = False
+        if size > checkpoint:
+            replayed = 0
+            with open(self.path, "rb") as f:
+                f.seek(checkpoint)
+                for line in f:
+                    needs_newline = not line.endswith(b"\n")
+                    try:
+                        self._mark_done(orjson.loads(line)["word"])
+                        replayed += 1
+                    except (orjson.JSONDecodeError, KeyError, TypeError):
+                        # Most likely a record cut short by an interrupted run
+                        logger.warning(f"Skipping malformed record in {self.path}")
+            logger.info(f"Indexed {replayed} new results from {self.path}")
+
+        self.file = open(self.path, "ab")
+        if needs_newline:
+            # Keep the next record off the end of a truncated one
+            self.file.write(b"\n")
+        logger.info(f"Loaded {len(self.words)} stored results from {self.path}")
+
+        # Results saved as one file per word by older versions, found with a
+        # single directory scan
+        if os.path.isdir(self.legacy_dir):
+            with os.scandir(self.legacy_dir) as entries:
+                self.legacy_names = frozenset(
+                    entry.name[:-5] for entry in entries if entry.name.endswith(".json")
+                )
+            logger.info(
+                f"Found {len(self.legacy_names)} legacy results in {self.legacy_dir}"
+            )
+
+    def contains(self, word):
+        """Check if a result for the word is stored in the shard or legacy files."""
+        if word in self.words:
+            return True
+        return bool(self.legacy_names) and sanitize_filename(word) in self.legacy_names
+
+    def append(self, word, data):
+        """Write a result record; it is indexed durably at the next checkpoint."""
+        self.file.write(orjson.dumps({"word": word, "data": data}) + b"\n")
+        # Every result is a paid API call, so it goes to the OS straight away
+        # rather than being lost with a buffer if the process is killed
+        self.file.flush()
+        self._mark_done(word)
+
+    def checkpoint(self):
+        """Flush buffered records and record how much of the file is indexed."""
+        self.file.flush()
+        self.progress.execute(
+            "INSERT OR REPLACE INTO checkpoints (kind, size) VALUES (?, ?)",
+            (self.kind, self.file.tell()),
+        )
+
+    def close(self):
+        """Close the shard."""
+        if self.file is not None:
+            self.file.close()
+            self.file = None
+        self.progress = None
 
+    def _mark_done(self, word):
+        self.words.add(word)
+        self.progress.execute(
+            "INSERT OR IGNORE INTO done (word, kind) VALUES (?, ?)", (word, self.kind)
+        )
 
-def get_dictionary_path(word):
-    """Get the path for a dictionary result file."""
-    sanitized = sanitize_filename(word)
-    return os.path.join(DICTIONARY_DIR, f"{sanitized}.json")
 
+_dictionary_shard = _ResultShard("dictionary", DICTIONARY_PATH, LEGACY_DICTIONARY_DIR)
+_thesaurus_shard = _ResultShard("thesaurus", THESAURUS_PATH, LEGACY_THESAURUS_DIR)
 
-def get_thesaurus_path(word):
-    """Get the path for a thesaurus result file."""
-    sanitized = sanitize_filename(word)
-    return os.path.join(THESAURUS_DIR, f"{sanitized}.json")
+# Progress database connection and results saved since the last checkpoint
+_progress = None
+_pending_results = 0
+
+
+def ensure_data_directories():
+    """Create necessary data directories if they don't exist."""
+    os.makedirs(DATA_DIR, exist_ok=True)
+    logger.info(f"Ensured data directory exists: {DATA_DIR}")
+
+
+def _open_progress_db():
+    """Open the progress database, creating its tables if needed."""
+    progress = sqlite3.connect(PROGRESS_DB_PATH)
+    progress.execute("PRAGMA journal_mode=WAL")
+    progress.execute("PRAGMA synchronous=NORMAL")
+    progress.execute(
+        "CREATE TABLE IF NOT EXISTS done ("
+        "word TEXT NOT NULL, kind TEXT NOT NULL, PRIMARY KEY (word, kind)"
+        ") WITHOUT ROWID"
+    )
+    progress.execute(
+        "CREATE TABLE IF NOT EXISTS checkpoints ("
+        "kind TEXT PRIMARY KEY, size INTEGER NOT NULL"
+        ")"
+    )
+    progress.commit()
+    return progress
+
+
+def _checkpoint_results():
+    """Flush both result files, then commit the progress database to match."""
+    global _pending_results
+    _dictionary_shard.checkpoint()
+    _thesaurus_shard.checkpoint()
+    # Committing only after the flushes means the database never lists a
+    # result that isn't in the result files
+    _progress.commit()
+    _pending_results = 0
+
+
+def _result_saved():
+    """Count a saved result and checkpoint every RESULT_CHECKPOINT_INTERVAL results."""
+    global _pending_results
+    _pending_results += 1
+    if _pending_results >= RESULT_CHECKPOINT_INTERVAL:
+        _checkpoint_results()
+
+
+def open_result_files():
+    """Load stored dictionary and thesaurus results and open them for appending."""
+    global _progress
+    _progress = _open_progress_db()
+    _dictionary_shard.open(_progress)
+    _thesaurus_shard.open(_progress)
+    _checkpoint_results()
+
+
+def close_result_files():
+    """Checkpoint and close the result files and the progress database."""
+    global _progress
+    if _progress is None:
+        return
+    _checkpoint_results()
+    _dictionary_shard.close()
+    _thesaurus_shard.close()
+    _progress.close()
+    _progress = None
 
 
 def dictionary_result_exists(word):
     """Check if dictionary result already exists for the word."""
-    return os.path.exists(get_dictionary_path(word))
+    return _dictionary_shard.contains(word)
 
 
 def thesaurus_result_exists(word):
     """Check if thesaurus result already exists for the word."""
-    return os.path.exists(get_thesaurus_path(word))
+    return _thesaurus_shard.contains(word)
 
 
 def save_dictionary_result(word, data):
     """Save dictionary API result."""
-    path = get_dictionary_path(word)
-    with open(path, "w", encoding="utf-8") as f:
-        json.dump(data, f, ensure_ascii=False, indent=2)
+    _dictionary_shard.append(word, data)
+    _result_saved()
     logger.debug(f"Saved dictionary result for '{word}'")
 
 
 def save_thesaurus_result(word, data):
     """Save thesaurus result."""
-    path = get_thesaurus_path(word)
-    with open(path, "w", encoding="utf-8") as f:
-        json.dump(data, f, ensure_ascii=False, indent=2)
+    _thesaurus_shard.append(word, data)
+    _result_saved()
     logger.debug(f"Saved thesaurus result for '{word}'")
 
 
 def load_source_fragments(fragment_paths):
     """
-    Load and concatenate source fragments.
+    Memory-map source fragments one at a time.
+
+    Each map is closed once the consumer moves on to the next fragment, so
+    it must not be used after that. Sources that aren't regular files, like
+    pipes, are read into memory instead.
 
     Args:
         fragment_paths (list): List of paths to source fragments
 
-    Returns:
-        str: Concatenated content
+    Yields:
+        mmap.mmap or bytes: Read-only raw content of each non-empty fragment
     """
-    content = ""
+    total_length = 0
     for path in fragment_paths:
         try:
-            with open(path, "r", encoding="utf-8") as f:
-                fragment_content = f.read()
-                content += fragment_content + "\n"
-                logger.debug(
-                    f"Loaded fragment from {path} ({len(fragment_content)} characters)"
-                )
+            with open(path, "rb") as f:
+                info = os.fstat(f.fileno())
+                if not stat.S_ISREG(info.st_mode):
+                    # Pipes and devices like /dev/stdin cannot be memory-mapped
+                    fragment_content = f.read()
+                elif info.st_size == 0:
+                    # Empty files cannot be memory-mapped and hold no words anyway
+                    logger.debug(f"Skipping empty fragment {path}")
+                    continue
+                else:
+                    # The map stays valid after the file itself is closed
+                    fragment_content = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
         except Exception as e:
             logger.error(f"Failed to load fragment from {path}: {str(e)}")
             raise
 
+        total_length += len(fragment_content)
+        logger.debug(f"Loaded fragment from {path} ({len(fragment_content)} bytes)")
+        try:
+            yield fragment_content
+        finally:
+            if isinstance(fragment_content, mmap.mmap):
+                fragment_content.close()
+
     logger.info(
-        f"Loaded {len(fragment_paths)} source fragments, total {len(content)} characters"
+        f"Loaded {len(fragment_paths)} source fragments, total {total_length} bytes"
     )
-    return content
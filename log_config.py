@@ -1,27 +1,44 @@
 # Logging configuration
 
+import atexit
 import logging
 import os
+import queue
 from datetime import datetime
+from logging.handlers import QueueHandler, QueueListener
 
 
 def setup_logging():
-    """Configure logging for the application."""
+    """
+    Configure logging for the application.
+
+    Records are handed to a queue and written to the log file and console by
+    a background listener thread, which is stopped (and drained) at exit.
+    """
     log_dir = "logs"
     os.makedirs(log_dir, exist_ok=True)
 
     log_filename = f"scp_extractor_{datetime.now().strftime('%Y%m%d_%H%M%S')}.log"
     log_path = os.path.join(log_dir, log_filename)
 
-    # Configure logging
-    logging.basicConfig(
-        level=logging.INFO,
-        format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
-        handlers=[
-            logging.FileHandler(log_path),
-            logging.StreamHandler(),  # Also log to console
-        ],
+    # Configure the handlers that do the actual writing
+    formatter = logging.Formatter(
+        "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
     )
+    file_handler = logging.FileHandler(log_path)
+    file_handler.setFormatter(formatter)
+    stream_handler = logging.StreamHandler()  # Also log to console
+    stream_handler.setFormatter(formatter)
+
+    # Write records from a background thread so logging never blocks callers
+    log_queue = queue.SimpleQueue()
+    listener = QueueListener(log_queue, file_handler, stream_handler)
+    listener.start()
+    atexit.register(listener.stop)
+
+    root_logger = logging.getLogger()
+    root_logger.setLevel(logging.INFO)
+    root_logger.addHandler(QueueHandler(log_queue))
 
     # Create logger
     logger = logging.getLogger("scp_word_extractor")
@@ -2,14 +2,19 @@
 # Main script for SCP word extraction and definition lookup
 
 import sys
-import time
+import bisect
+import logging
+import asyncio
 import argparse
-from constants import SAFE_CALL_LIMIT
+import itertools
+from constants import MAX_CONCURRENT_WORDS, PROGRESS_LOG_INTERVAL, SAFE_CALL_LIMIT
 from log_config import setup_logging
 from word_extractor import extract_unique_words_from_wikidot
 from mw_api import APIManager
 from data_manager import (
     ensure_data_directories,
+    open_result_files,
+    close_result_files,
     dictionary_result_exists,
     thesaurus_result_exists,
     save_dictionary_result,
@@ -17,6 +22,124 @@ from data_manager import (
     load_source_fragments,
 )
 
+logger = logging.getLogger("scp_word_extractor")
+
+
+async def lookup_and_save(word, kind, result_exists, fetch_entry, save_result, counts):
+    """
+    Look up a word with one API and save the result if it isn't stored yet.
+
+    Args:
+        word (str): Word to look up
+        kind (str): "dictionary" or "thesaurus"
+        result_exists (callable): Check for an existing saved result
+        fetch_entry (callable): Coroutine function performing the API lookup
+        save_result (callable): Function saving the API result
+        counts (dict): Processing counters, updated in place
+
+    Returns:
+        bool: False if the lookup was refused because of rate limiting
+    """
+    if result_exists(word):
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(
+                f"{kind.capitalize()} entry for '{word}' already exists, skipping"
+            )
+        counts["skip"] += 1
+        return True
+
+    result = await fetch_entry(word)
+
+    # Calls refused before reaching the API are left out of the call counts
+    if not (isinstance(result, dict) and result.get("refused")):
+        counts[f"{kind}_calls"] += 1
+
+    # Rate limited results are not saved so the word is retried on resume
+    if isinstance(result, dict) and result.get("status_code") == 429:
+        return False
+
+    save_result(word, result)
+    if not isinstance(result, dict) or not result.get("error"):
+        counts["success"] += 1
+    else:
+        counts["error"] += 1
+    return True
+
+
+async def process_words(api, words, start_idx, completed, counts):
+    """
+    Look up dictionary and thesaurus entries for words concurrently.
+
+    Args:
+        api (APIManager): API manager used for the lookups
+        words (list): Sorted list of all words
+        start_idx (int): Index of the first word to process
+        completed (list): Per-word completion flags, updated in place
+        counts (dict): Processing counters, updated in place
+    """
+    stop_event = asyncio.Event()
+
+    def stop():
+        if stop_event.is_set():
+            return
+        stop_event.set()
+        if api.call_count >= SAFE_CALL_LIMIT:
+            logger.warning(f"Reached safe API call limit ({SAFE_CALL_LIMIT})")
+        else:
+            logger.error("Rate limit exceeded, stopping")
+
+    async def process_word(idx, word):
+        if idx % PROGRESS_LOG_INTERVAL == 0:
+            logger.info(f"Processing word {idx + 1}/{len(words)}: '{word}'")
+
+        dict_ok, thes_ok = await asyncio.gather(
+            lookup_and_save(
+                word,
+                "dictionary",
+                dictionary_result_exists,
+                api.get_dictionary_entry,
+                save_dictionary_result,
+                counts,
+            ),
+            lookup_and_save(
+                word,
+                "thesaurus",
+                thesaurus_result_exists,
+                api.get_thesaurus_entry,
+                save_thesaurus_result,
+                counts,
+            ),
+        )
+        if not (dict_ok and thes_ok):
+            stop()
+            return
+        completed[idx] = True
+
+        # Check if we've reached the safe API call limit
+        if api.call_count >= SAFE_CALL_LIMIT:
+            stop()
+
+    # A fixed pool of workers pulls words from one shared iterator, so the
+    # number of pending tasks doesn't grow with the number of words
+    pending_words = enumerate(itertools.islice(words, start_idx, None), start_idx)
+
+    async def worker():
+        for idx, word in pending_words:
+            if stop_event.is_set():
+                return
+            await process_word(idx, word)
+
+    async with api:
+        await asyncio.gather(*(worker() for _ in range(MAX_CONCURRENT_WORDS)))
+
+
+def first_unprocessed_index(completed, start_idx):
+    """Return the index of the first word from start_idx that wasn't completed."""
+    for idx in range(start_idx, len(completed)):
+        if not completed[idx]:
+            return idx
+    return len(completed)
+
 
 def main():
     """Main function that orchestrates the extraction and API lookup process."""
@@ -45,12 +168,9 @@ def main():
     # Ensure data directories exist
     ensure_data_directories()
 
-    # Load and concatenate source fragments
-    content = load_source_fragments(args.source)
-
-    # Extract unique words
+    # Extract unique words, streaming source fragments one at a time
     logger.info("Extracting unique words from source content")
-    words = extract_unique_words_from_wikidot(content)
+    words = extract_unique_words_from_wikidot(load_source_fragments(args.source))
     logger.info(f"Extracted {len(words)} unique words")
 
     # Limit words if max_words is specified
@@ -69,117 +189,60 @@ def main():
     start_idx = 0
     if args.start_word:
         start_word = args.start_word.lower()
-        try:
-            start_idx = words.index(start_word)
+        # The word list is sorted, so binary search finds the start word
+        start_idx = bisect.bisect_left(words, start_word)
+        if start_idx < len(words) and words[start_idx] == start_word:
             logger.info(f"Resuming from word '{start_word}' (index {start_idx})")
-        except ValueError:
+        else:
             logger.warning(
                 f"Start word '{start_word}' not found in word list, starting from beginning"
             )
+            start_idx = 0
 
     # Process words
-    success_count = 0
-    error_count = 0
-    skip_count = 0
-    dict_calls = 0
-    thes_calls = 0
-
+    counts = {
+        "success": 0,
+        "error": 0,
+        "skip": 0,
+        "dictionary_calls": 0,
+        "thesaurus_calls": 0,
+    }
+    completed = [False] * len(words)
+
+    open_result_files()
     try:
-        for idx, word in enumerate(words[start_idx:], start_idx):
-            logger.info(f"Processing word {idx + 1}/{len(words)}: '{word}'")
-
-            # Dictionary lookup
-            dict_result = None
-            if not dictionary_result_exists(word):
-                dict_result = api.get_dictionary_entry(word)
-                save_dictionary_result(word, dict_result)
-                dict_calls += 1
-
-                # Check for rate limit or critical errors
-                if (
-                    isinstance(dict_result, dict)
-                    and dict_result.get("status_code") == 429
-                ):
-                    logger.error("Rate limit exceeded, stopping")
-                    break
-            else:
-                logger.debug(f"Dictionary entry for '{word}' already exists, skipping")
-                skip_count += 1
-
-            # Thesaurus lookup
-            thes_result = None
-            if not thesaurus_result_exists(word):
-                thes_result = api.get_thesaurus_entry(word)
-                save_thesaurus_result(word, thes_result)
-                thes_calls += 1
-
-                # Check for rate limit or critical errors
-                if (
-                    isinstance(thes_result, dict)
-                    and thes_result.get("status_code") == 429
-                ):
-                    logger.error("Rate limit exceeded, stopping")
-                    break
-            else:
-                logger.debug(f"Thesaurus entry for '{word}' already exists, skipping")
-                skip_count += 1
-
-            # Update success and error counts based on results
-            if dict_result is not None:
-                if not isinstance(dict_result, dict) or not dict_result.get("error"):
-                    success_count += 1
-                else:
-                    error_count += 1
-
-            if thes_result is not None:
-                if not isinstance(thes_result, dict) or not thes_result.get("error"):
-                    success_count += 1
-                else:
-                    error_count += 1
-
-            # Check if we've reached the safe API call limit
-            if api.call_count >= SAFE_CALL_LIMIT:
-                logger.warning(f"Reached safe API call limit ({SAFE_CALL_LIMIT})")
-                logger.info(f"Last word processed: '{word}' (index {idx})")
-                if idx + 1 < len(words):
-                    logger.info(f"To resume, run with: --start-word {words[idx + 1]}")
-                break
-
-            # Add a small delay between words to be nice to the API
-            time.sleep(0.1)
-
-        last_idx = idx
+        asyncio.run(process_words(api, words, start_idx, completed, counts))
     except KeyboardInterrupt:
         logger.info("Process interrupted by user")
-        last_idx = idx - 1
-        if last_idx >= 0 and last_idx + 1 < len(words):
-            logger.info(f"To resume, run with: --start-word {words[last_idx + 1]}")
     except Exception as e:
         logger.error(f"Unexpected error: {str(e)}", exc_info=True)
-        last_idx = idx - 1
-        if last_idx >= 0 and last_idx + 1 < len(words):
-            logger.info(f"To resume, run with: --start-word {words[last_idx + 1]}")
+        next_idx = first_unprocessed_index(completed, start_idx)
+        if next_idx < len(words):
+            logger.info(f"To resume, run with: --start-word {words[next_idx]}")
         raise
+    finally:
+        close_result_files()
+
+    # Words are processed out of order, so resume from the first one not done
+    next_idx = first_unprocessed_index(completed, start_idx)
 
     # Report statistics
     api_stats = api.get_api_stats()
     logger.info("=== Processing Complete ===")
     logger.info(f"Total unique words: {len(words)}")
+    logger.info(f"Words processed this session: {sum(completed)}/{len(words)}")
     logger.info(
-        f"Words processed this session: {last_idx - start_idx + 1 if last_idx >= start_idx else 0}/{len(words)}"
-    )
-    logger.info(
-        f"API calls made: {api_stats['call_count']} (Dictionary: {dict_calls}, Thesaurus: {thes_calls})"
+        f"API calls made: {api_stats['call_count']} (Dictionary: {counts['dictionary_calls']}, Thesaurus: {counts['thesaurus_calls']})"
     )
     logger.info(f"Remaining API calls: {api_stats['remaining_calls']}")
-    logger.info(f"Success count: {success_count}")
-    logger.info(f"Error count: {error_count}")
-    logger.info(f"Skip count: {skip_count}")
+    logger.info(f"Success count: {counts['success']}")
+    logger.info(f"Error count: {counts['error']}")
+    logger.info(f"Skip count: {counts['skip']}")
     logger.info(f"Elapsed time: {api_stats['elapsed_time']:.2f} seconds")
     logger.info(f"Average rate: {api_stats['calls_per_minute']:.2f} calls per minute")
 
-    if last_idx < len(words) - 1:
-        logger.info(f"To resume, run with: --start-word {words[last_idx + 1]}")
+    if next_idx < len(words):
+        logger.info(f"To resume, run with: --start-word {words[next_idx]}")
     else:
         logger.info("All words processed successfully")
 
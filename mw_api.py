@@ -1,15 +1,25 @@
 # Merriam-Webster API interaction
 
-import json
+import asyncio
 import logging
+import math
 import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
 from urllib.parse import quote
 
-import requests
+import aiohttp
+import orjson
+from aiolimiter import AsyncLimiter
 
 from constants import (
+    API_RATE_LIMIT,
+    API_RATE_PERIOD,
+    CONNECTION_KEEPALIVE_TIMEOUT,
     DICTIONARY_API_BASE_URL,
     DICTIONARY_API_KEY,
+    MAX_CONNECTIONS_PER_HOST,
+    MAX_RETRY_AFTER,
     SAFE_CALL_LIMIT,
     THESAURUS_API_BASE_URL,
     THESAURUS_API_KEY,
@@ -18,11 +28,41 @@ from constants import (
 logger = logging.getLogger("scp_word_extractor")
 
 
+def _parse_retry_after(value):
+    """
+    Parse a Retry-After header value.
+
+    Args:
+        value (str or None): Header value, either seconds or an HTTP date
+
+    Returns:
+        float or None: Seconds to wait, or None if missing or invalid
+    """
+    if not value:
+        return None
+    try:
+        seconds = float(value)
+    except ValueError:
+        try:
+            retry_at = parsedate_to_datetime(value)
+        except (TypeError, ValueError):
+            return None
+        # Dates with a -0000 offset parse as naive, but are still UTC
+        if retry_at.tzinfo is None:
+            retry_at = retry_at.replace(tzinfo=timezone.utc)
+        seconds = (retry_at - datetime.now(timezone.utc)).total_seconds()
+
+    # Reject inf and nan, which would pause every lookup forever
+    if not math.isfinite(seconds):
+        return None
+    return max(seconds, 0.0)
+
+
 class APIManager:
     """Manages interactions with Merriam-Webster APIs, including rate limiting."""
 
     def __init__(self):
-        """Initialize the API manager with call tracking."""
+        """Initialize the API manager with call tracking and rate limiting."""
         if not DICTIONARY_API_KEY or not THESAURUS_API_KEY:
             raise ValueError(
                 "API keys not set. Please set MERRIAM_WEBSTER_DICT_API_KEY and MERRIAM_WEBSTER_THES_API_KEY."
@@ -32,9 +72,34 @@ class APIManager:
         self.thes_api_key = THESAURUS_API_KEY
         self.call_count = 0
         self.start_time = time.time()
+        self.session = None
+        self.paused_until = 0.0  # time.monotonic() before which no calls are made
+        self.rate_limit_pauses = 0  # Pauses for 429s since the last other response
+        self.throttled = False  # Set once the API keeps refusing calls with 429
+        self.limiter = AsyncLimiter(
+            max_rate=API_RATE_LIMIT, time_period=API_RATE_PERIOD
+        )
         logger.info("API Manager initialized")
 
-    def _make_request(self, url, max_retries=3, backoff_factor=1.5):
+    async def __aenter__(self):
+        """Open the HTTP session shared by all requests."""
+        # Pooled keep-alive connections are reused across lookups
+        connector = aiohttp.TCPConnector(
+            limit_per_host=MAX_CONNECTIONS_PER_HOST,
+            keepalive_timeout=CONNECTION_KEEPALIVE_TIMEOUT,
+        )
+        self.session = aiohttp.ClientSession(
+            connector=connector,
+            timeout=aiohttp.ClientTimeout(total=10),
+        )
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        """Close the shared HTTP session."""
+        await self.session.close()
+        self.session = None
+
+    async def _make_request(self, url, max_retries=3, backoff_factor=1.5):
         """
         Make an API request with retries and backoff.
 
@@ -44,49 +109,110 @@ class APIManager:
             backoff_factor (float): Factor for exponential backoff
 
         Returns:
-            dict or list or None: JSON response data or error information
+            dict or list or None: JSON response data or error information;
+                errors for calls refused without reaching the API are
+                marked with "refused"
         """
-        if self.call_count >= SAFE_CALL_LIMIT:
-            logger.warning(f"Reached safe API call limit ({SAFE_CALL_LIMIT})")
-            return {"error": "Rate limit reached", "status_code": 429}
-
         retries = 0
         while retries <= max_retries:
+            # Hold off while the server has asked all clients to back off
+            pause = self.paused_until - time.monotonic()
+            if pause > 0:
+                await asyncio.sleep(pause)
+
+            # Wait for a turn under the rate limit before the checks below, so
+            # lookups queued here aren't counted as calls already made
+            await self.limiter.acquire()
+            if self.paused_until > time.monotonic():
+                # Another lookup hit a 429 while this one waited for its turn
+                continue
+
+            # Once one lookup has given up on a 429, the others queued
+            # behind it would only be refused too
+            if self.throttled:
+                return {
+                    "error": "Rate limit exceeded",
+                    "status_code": 429,
+                    "refused": True,
+                }
+
+            # Check every attempt, retries included, since many lookups can
+            # be retrying at once. This must come after any await, so the
+            # check and the call count below can't be split by other lookups.
+            if self.call_count >= SAFE_CALL_LIMIT:
+                # Concurrent lookups can all land here; the caller reports it once
+                logger.debug(f"Reached safe API call limit ({SAFE_CALL_LIMIT})")
+                return {
+                    "error": "Rate limit reached",
+                    "status_code": 429,
+                    "refused": True,
+                }
+
             try:
                 logger.debug(f"Making API request (attempt {retries + 1})")
-                response = requests.get(url, timeout=10)
+                # Count the call before awaiting so concurrent requests
+                # cannot overshoot the safe limit
                 self.call_count += 1
+                async with self.session.get(url) as response:
+                    if response.status != 429:
+                        self.rate_limit_pauses = 0
 
-                if response.status_code == 200:
-                    try:
-                        return response.json()
-                    except json.JSONDecodeError as e:
-                        logger.error(f"Failed to parse JSON response: {str(e)}")
-                        return {"error": "JSON parse error", "status_code": -2}
+                    if response.status == 200:
+                        try:
+                            return orjson.loads(await response.read())
+                        except orjson.JSONDecodeError as e:
+                            logger.error(f"Failed to parse JSON response: {str(e)}")
+                            return {"error": "JSON parse error", "status_code": -2}
 
-                if response.status_code == 404:
-                    # Word not found
-                    logger.info("Word not found in API (404)")
-                    return {"error": "Not Found", "status_code": 404}
+                    if response.status == 404:
+                        # Word not found
+                        logger.info("Word not found in API (404)")
+                        return {"error": "Not Found", "status_code": 404}
 
-                if response.status_code == 429:
-                    # Rate limit exceeded
-                    logger.error("API rate limit exceeded (429)")
-                    return {"error": "Rate limit exceeded", "status_code": 429}
+                    retry_after = _parse_retry_after(
+                        response.headers.get("Retry-After")
+                    )
 
-                # Handle other error codes
-                logger.warning(
-                    f"API request failed with status code {response.status_code}"
-                )
                 retries += 1
+                if response.status == 429:
+                    # Rate limit exceeded, wait as long as the server asks
+                    logger.warning("API rate limit exceeded (429)")
+                    # 429s arriving while a pause is already running belong to
+                    # the same burst, so only those after it count as retries
+                    if time.monotonic() >= self.paused_until:
+                        self.rate_limit_pauses += 1
+                    if retries > max_retries or self.rate_limit_pauses > max_retries:
+                        logger.error("API rate limit still exceeded, giving up")
+                        self.throttled = True
+                        return {"error": "Rate limit exceeded", "status_code": 429}
+                    if retry_after is not None and retry_after > MAX_RETRY_AFTER:
+                        # Likely the daily quota; stop rather than wait it out
+                        logger.error(
+                            f"API asked to retry after {retry_after:.0f} seconds, giving up"
+                        )
+                        self.throttled = True
+                        return {"error": "Rate limit exceeded", "status_code": 429}
+                    if retry_after is None:
+                        retry_after = backoff_factor**retries
+                    logger.info(
+                        f"Retrying in {retry_after:.2f} seconds (attempt {retries}/{max_retries})"
+                    )
+                    # Other in-flight lookups wait too, instead of hitting 429
+                    self.paused_until = max(
+                        self.paused_until, time.monotonic() + retry_after
+                    )
+                    continue
+
+                # Handle other error codes
+                logger.warning(f"API request failed with status code {response.status}")
                 if retries <= max_retries:
                     sleep_time = backoff_factor**retries
                     logger.info(
                         f"Retrying in {sleep_time:.2f} seconds (attempt {retries}/{max_retries})"
                     )
-                    time.sleep(sleep_time)
+                    await asyncio.sleep(sleep_time)
 
-            except requests.RequestException as e:
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
                 logger.error(f"Request error: {str(e)}")
                 retries += 1
                 if retries <= max_retries:
@@ -94,27 +220,27 @@ class APIManager:
                     logger.info(
                         f"Retrying in {sleep_time:.2f} seconds (attempt {retries}/{max_retries})"
                     )
-                    time.sleep(sleep_time)
+                    await asyncio.sleep(sleep_time)
                 else:
                     return {"error": str(e), "status_code": -1}
 
         return {"error": "Max retries exceeded", "status_code": -1}
 
-    def get_dictionary_entry(self, word):
+    async def get_dictionary_entry(self, word):
         """
         Get dictionary entry for a word.
 
         Args:
-            word (str): Word to look up
+            word (str): Lowercase word to look up, as produced by the extractor
 
         Returns:
             dict or list: API response or error data
         """
-        encoded_word = quote(word.lower())
+        encoded_word = quote(word)
         url = f"{DICTIONARY_API_BASE_URL}{encoded_word}?key={self.dict_api_key}"
 
         logger.info(f"Looking up dictionary entry for '{word}'")
-        result = self._make_request(url)
+        result = await self._make_request(url)
 
         # Check if the result is a list of suggestions rather than definitions
         if (
@@ -131,21 +257,21 @@ class APIManager:
 
         return result
 
-    def get_thesaurus_entry(self, word):
+    async def get_thesaurus_entry(self, word):
         """
         Get thesaurus entry for a word.
 
         Args:
-            word (str): Word to look up
+            word (str): Lowercase word to look up, as produced by the extractor
 
         Returns:
             dict or list: API response or error data
         """
-        encoded_word = quote(word.lower())
+        encoded_word = quote(word)
         url = f"{THESAURUS_API_BASE_URL}{encoded_word}?key={self.thes_api_key}"
 
         logger.info(f"Looking up thesaurus entry for '{word}'")
-        result = self._make_request(url)
+        result = await self._make_request(url)
 
         # Check if the result is a list of suggestions rather than entries
         if (
@@ -0,0 +1,126 @@
+# Tests for result storage and the progress database
+
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+import data_manager
+
+
+class ResultShardTest(unittest.TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.dir = tmp.name
+        self.path = os.path.join(self.dir, "dictionary.jsonl")
+        patcher = mock.patch.object(
+            data_manager, "PROGRESS_DB_PATH", os.path.join(self.dir, "progress.db")
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def open_shard(self):
+        """Open the progress database and a dictionary shard in the temp dir."""
+        progress = data_manager._open_progress_db()
+        self.addCleanup(progress.close)
+        shard = data_manager._ResultShard(
+            "dictionary", self.path, os.path.join(self.dir, "dictionary")
+        )
+        shard.open(progress)
+        self.addCleanup(shard.close)
+        return shard, progress
+
+    def write_records(self, content):
+        with open(self.path, "ab") as f:
+            f.write(content)
+
+    def test_no_progress_db(self):
+        self.write_records(
+            b'{"word": "alpha", "data": []}\n{"word": "beta", "data": []}\n'
+        )
+        shard, _ = self.open_shard()
+        self.assertTrue(shard.contains("alpha"))
+        self.assertTrue(shard.contains("beta"))
+        self.assertFalse(shard.contains("gamma"))
+
+    def test_record_cut_off_mid_line(self):
+        self.write_records(b'{"word": "alpha", "data": []}\n{"word": "be')
+        with self.assertLogs("scp_word_extractor", "WARNING"):
+            shard, progress = self.open_shard()
+        self.assertTrue(shard.contains("alpha"))
+        self.assertFalse(shard.contains("beta"))
+
+        # The next record starts on a line of its own
+        shard.append("beta", [])
+        shard.close()
+        progress.close()
+        os.remove(data_manager.PROGRESS_DB_PATH)
+        with self.assertLogs("scp_word_extractor", "WARNING"):
+            shard, _ = self.open_shard()
+        self.assertTrue(shard.contains("alpha"))
+        self.assertTrue(shard.contains("beta"))
+
+    def test_file_shorter_than_checkpoint(self):
+        shard, progress = self.open_shard()
+        shard.append("alpha", [])
+        shard.append("beta", [])
+        shard.checkpoint()
+        progress.commit()
+        shard.close()
+        progress.close()
+
+        # Replace the file with a shorter one, e.g. restored from a backup
+        os.remove(self.path)
+        self.write_records(b'{"word": "gamma", "data": []}\n')
+        with self.assertLogs("scp_word_extractor", "WARNING"):
+            shard, _ = self.open_shard()
+        self.assertFalse(shard.contains("alpha"))
+        self.assertFalse(shard.contains("beta"))
+        self.assertTrue(shard.contains("gamma"))
+
+    def test_replay_past_checkpoint(self):
+        shard, progress = self.open_shard()
+        shard.append("alpha", [])
+        shard.checkpoint()
+        progress.commit()
+
+        # Interrupted before the next checkpoint: the record is on disk, but
+        # the progress database never hears of it
+        shard.append("beta", [])
+        with open(self.path, "rb") as f:
+            self.assertIn(b'"beta"', f.read())
+        progress.rollback()
+        shard.close()
+        progress.close()
+
+        shard, _ = self.open_shard()
+        self.assertTrue(shard.contains("alpha"))
+        self.assertTrue(shard.contains("beta"))
+
+
+class LoadSourceFragmentsTest(unittest.TestCase):
+    def load(self, paths):
+        return [
+            bytes(fragment) for fragment in data_manager.load_source_fragments(paths)
+        ]
+
+    def test_regular_and_empty_files(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            paths = [os.path.join(tmp, name) for name in ("one.txt", "empty.txt")]
+            with open(paths[0], "wb") as f:
+                f.write(b"some words")
+            open(paths[1], "wb").close()
+            self.assertEqual(self.load(paths), [b"some words"])
+
+    @unittest.skipUnless(os.path.isdir("/dev/fd"), "needs /dev/fd")
+    def test_pipe(self):
+        read_fd, write_fd = os.pipe()
+        self.addCleanup(os.close, read_fd)
+        os.write(write_fd, b"piped words")
+        os.close(write_fd)
+        self.assertEqual(self.load([f"/dev/fd/{read_fd}"]), [b"piped words"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,113 @@
+# Tests for Merriam-Webster API helpers
+
+import asyncio
+import unittest
+from unittest import mock
+
+import mw_api
+from mw_api import _parse_retry_after
+
+
+class FakeResponse:
+    """Stand-in for an aiohttp response with an empty JSON body."""
+
+    def __init__(self, status, headers, wait):
+        self.status = status
+        self.headers = headers
+        self.wait = wait
+
+    async def __aenter__(self):
+        if self.wait:
+            # Let other lookups send their requests before this one returns
+            await asyncio.sleep(0)
+        return self
+
+    async def __aexit__(self, *exc_info):
+        return False
+
+    async def read(self):
+        return b"[]"
+
+
+class FakeSession:
+    """Stand-in for an aiohttp session answering every request the same way."""
+
+    def __init__(self, status, headers=None, wait=False):
+        self.status = status
+        self.headers = headers or {}
+        self.wait = wait
+        self.urls = []
+
+    def get(self, url):
+        self.urls.append(url)
+        return FakeResponse(self.status, self.headers, self.wait)
+
+
+class ParseRetryAfterTest(unittest.TestCase):
+    def test_seconds(self):
+        self.assertEqual(_parse_retry_after("2.5"), 2.5)
+        self.assertEqual(_parse_retry_after("-3"), 0.0)
+
+    def test_http_date_in_the_past(self):
+        self.assertEqual(_parse_retry_after("Wed, 21 Oct 2015 07:28:00 GMT"), 0.0)
+
+    def test_http_date_with_unknown_offset(self):
+        # -0000 parses to a naive datetime, which is treated as UTC
+        self.assertEqual(_parse_retry_after("Wed, 21 Oct 2015 07:28:00 -0000"), 0.0)
+        self.assertGreater(_parse_retry_after("Wed, 21 Oct 2099 07:28:00 -0000"), 0)
+
+    def test_invalid_values(self):
+        for value in (None, "", "junk", "inf", "-inf", "nan"):
+            with self.subTest(value=value):
+                self.assertIsNone(_parse_retry_after(value))
+
+
+class MakeRequestTest(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        with mock.patch.multiple(
+            mw_api, DICTIONARY_API_KEY="key", THESAURUS_API_KEY="key"
+        ):
+            self.api = mw_api.APIManager()
+
+    async def run_lookups(self, session, **kwargs):
+        """Run four concurrent requests, failing if any is sent after giving up."""
+        get = session.get
+
+        def checked_get(url):
+            self.assertFalse(self.api.throttled, "request sent after giving up")
+            return get(url)
+
+        self.api.session = session
+        session.get = checked_get
+        with self.assertLogs("scp_word_extractor", "ERROR"):
+            results = await asyncio.gather(
+                *(self.api._make_request("url", **kwargs) for _ in range(4))
+            )
+        for result in results:
+            self.assertEqual(result["status_code"], 429)
+        return results
+
+    async def test_no_requests_after_long_retry_after(self):
+        session = FakeSession(429, {"Retry-After": "3600"})
+        results = await self.run_lookups(session)
+        self.assertEqual(len(session.urls), 1)
+        # Only the lookup that reached the API isn't marked as refused
+        self.assertEqual(
+            [result.get("refused", False) for result in results],
+            [False, True, True, True],
+        )
+
+    async def test_no_requests_after_retries_used_up(self):
+        session = FakeSession(429)
+        await self.run_lookups(session, max_retries=0)
+        self.assertEqual(len(session.urls), 1)
+
+    async def test_retries_shared_by_concurrent_lookups(self):
+        session = FakeSession(429, {"Retry-After": "0"}, wait=True)
+        await self.run_lookups(session, max_retries=3)
+        # Each lookup on its own would make four attempts
+        self.assertLess(len(session.urls), 4 * 4)
+
+
+if __name__ == "__main__":
+    unittest.main()
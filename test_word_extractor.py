@@ -0,0 +1,75 @@
+# Tests for word extraction from Wikidot SCP content
+
+import unittest
+
+from word_extractor import extract_unique_words_from_wikidot, extract_words_from_css
+
+
+def extract(*fragments):
+    """Extract words from source fragments given as str."""
+    return extract_unique_words_from_wikidot(f.encode("utf-8") for f in fragments)
+
+
+class ExtractUniqueWordsTest(unittest.TestCase):
+    def test_hyphenated_and_apostrophe_words(self):
+        self.assertEqual(extract("Don't be self-aware"), ["be", "don't", "self-aware"])
+
+    def test_wikidot_strikethrough(self):
+        self.assertEqual(
+            extract("--struck out-- text --self-aware--"),
+            ["out", "self-aware", "struck", "text"],
+        )
+
+    def test_double_hyphen_dash(self):
+        self.assertEqual(
+            extract("He walked--slowly--home."),
+            ["he", "home", "slowly", "walked"],
+        )
+
+    def test_words_across_fragments(self):
+        self.assertEqual(
+            extract("**bold** text", "//Text// again"),
+            [
+                "again",
+                "bold",
+                "text",
+            ],
+        )
+
+    def test_wikidot_colored_text(self):
+        self.assertEqual(extract("##ff0000|red## ##blue|sky##"), ["blue", "red", "sky"])
+
+    def test_page_anchor(self):
+        self.assertEqual(extract("[[[page#bead|link]]]"), ["bead", "link", "page"])
+
+    def test_css_block_parsed_separately(self):
+        self.assertEqual(
+            extract("Text [[module CSS]]\n#fade { color: #abcdef; }\n[[/module]]"),
+            ["color", "fade", "text"],
+        )
+
+
+class ExtractWordsFromCssTest(unittest.TestCase):
+    def test_double_hyphen_in_comment(self):
+        self.assertEqual(extract_words_from_css("/* note--todo */"), ["note", "todo"])
+
+    def test_hex_color_value(self):
+        self.assertEqual(
+            set(extract_words_from_css(".box { color: #abcdef; border: solid #fade }")),
+            {"box", "color", "border", "solid"},
+        )
+
+    def test_id_selector(self):
+        self.assertEqual(
+            set(extract_words_from_css("#fade { opacity: 0; }")), {"fade", "opacity"}
+        )
+
+    def test_hyphenated_property_parts(self):
+        words = extract_words_from_css(".scp-image:hover { background-color: red; }")
+        for word in ("scp", "image", "background", "color"):
+            with self.subTest(word=word):
+                self.assertIn(word, words)
+
+
+if __name__ == "__main__":
+    unittest.main()
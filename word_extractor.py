@@ -6,69 +6,80 @@ from constants import MIN_WORD_LENGTH
 
 logger = logging.getLogger("scp_word_extractor")
 
-
-def extract_unique_words_from_wikidot(content):
+# Words with at least one letter, allowing apostrophes and hyphens
+# like "don't" or "self-aware". A doubled hyphen ends a word, since it is
+# Wikidot strikethrough (--text--) or a dash (word--word).
+_WORD_RE = re.compile(r"[a-zA-Z](?:[a-zA-Z']|-(?!-))*")
+
+# Wikidot syntax, matched directly against the raw source bytes. CSS blocks,
+# which get their own parsing, and colored text (##abcdef|text##) are matched
+# as a whole by the first alternatives, so their contents and hex codes never
+# form words; findall returns an empty string for them.
+_CSS_BLOCK_RE = re.compile(rb"\[\[module CSS\]\](.*?)\[\[\/module\]\]", re.DOTALL)
+_SOURCE_WORD_RE = re.compile(
+    rb"(?s:\[\[module CSS\]\].*?\[\[\/module\]\])"
+    rb"|##[0-9a-fA-F]+\|"
+    rb"|([a-zA-Z](?:[a-zA-Z']|-(?!-))*)"
+)
+
+# CSS syntax
+_CSS_COMMENT_RE = re.compile(r"\/\*(.*?)\*\/", re.DOTALL)
+_CSS_PROP_RE = re.compile(r"([a-zA-Z\-]+)\s*:\s*([^;]+);")
+_CSS_SELECTOR_RE = re.compile(r"([.#]?[a-zA-Z][a-zA-Z0-9\-_]*)")
+_CSS_SELECTOR_PART_RE = re.compile(r"[a-zA-Z][a-z]*")
+_CSS_RULE_BODY_RE = re.compile(r"\{[^{}]*\}")
+_CSS_HEX_COLOR_RE = re.compile(r"#[0-9a-fA-F]+\b")
+
+# Words in CSS property values, where hex colors like #abcdef are matched as
+# a whole the same way as in the source pass
+_CSS_VALUE_WORD_RE = re.compile(r"#[0-9a-fA-F]+\b|([a-zA-Z](?:[a-zA-Z']|-(?!-))*)")
+
+# Color functions and URLs found in CSS values, not words
+_CSS_SKIP_VALUES = frozenset({"rgb", "rgba", "hsl", "hsla", "url"})
+
+
+def extract_unique_words_from_wikidot(fragments):
     """
     Extract a unique list of potential English words from Wikidot source content.
 
     Args:
-        content (str): The Wikidot source content
+        fragments (iterable): The Wikidot source content as UTF-8 bytes-like
+            objects (e.g. memory-mapped files), one per fragment
 
     Returns:
         list: A sorted list of unique lowercase words
     """
     logger.info("Beginning word extraction from content")
 
-    # Step 1: Handle CSS blocks separately
-    # Extract words from CSS, then remove the blocks
-    css_blocks = re.findall(
-        r"\[\[module CSS\]\](.*?)\[\[\/module\]\]", content, re.DOTALL
-    )
-    css_words = []
-    for css in css_blocks:
-        css_words.extend(extract_words_from_css(css))
-
-    # Remove CSS blocks from content
-    content = re.sub(
-        r"\[\[module CSS\]\](.*?)\[\[\/module\]\]", " ", content, flags=re.DOTALL
-    )
-
-    # Step 2: Handle other Wikidot syntax while preserving words
-
-    # Replace [[...]] with spaces + content + spaces
-    content = re.sub(r"\[\[(.*?)\]\]", lambda m: " " + m.group(1) + " ", content)
-
-    # Replace formatting markers like **...**, //...// with spaces + content + spaces
-    content = re.sub(
-        r"(\*\*|\/{2}|__|--)(.*?)(\*\*|\/{2}|__|--)",
-        lambda m: " " + m.group(2) + " ",
-        content,
-    )
-
-    # Handle other syntax like {{...}}, @@...@@, etc.
-    content = re.sub(
-        r"(\{\{|\@\@)(.*?)(\}\}|\@\@)", lambda m: " " + m.group(2) + " ", content
-    )
-
-    # Step 3: Extract words from pre-processed content
-    # This pattern looks for words with at least one letter
-    # Allows words with apostrophes and hyphens like "don't" or "self-aware"
-    word_pattern = r"[a-zA-Z][a-zA-Z\'\-]*[a-zA-Z\'\-]|[a-zA-Z]"
-    raw_words = re.findall(word_pattern, content)
-
-    # Step 4: Clean and filter words
     words = set()
-    for word in raw_words + css_words:
-        word = word.lower()  # Convert to lowercase
-        # Filter by minimum length
-        if len(word) >= MIN_WORD_LENGTH:
-            words.add(word)
+    source_words = set()
+    for content in fragments:
+        # Step 1: Extract words from CSS blocks, which need their own parsing
+        # CSS blocks are never split across fragments
+        for match in _CSS_BLOCK_RE.finditer(content):
+            css = match.group(1).decode("utf-8", errors="replace")
+            _add_words(words, extract_words_from_css(css))
+
+        # Step 2: Extract words in a single pass over the raw content
+        # Wikidot markup like [[...]], **...** or //...// contains no letters,
+        # so it ends a word run without being stripped first. Matches are
+        # lowercased and deduplicated as bytes, entirely in C.
+        source_words.update(map(bytes.lower, _SOURCE_WORD_RE.findall(content)))
+    source_words.discard(b"")  # Left by CSS blocks and colored text
+
+    # Step 3: Decode only the unique words; they are pure ASCII by construction
+    _add_words(words, (word.decode("ascii") for word in source_words))
 
     result = sorted(words)
     logger.info(f"Extracted {len(result)} unique words")
     return result
 
 
+def _add_words(words, raw_words):
+    """Add lowercase versions of words meeting the minimum length to a set."""
+    words.update(word.lower() for word in raw_words if len(word) >= MIN_WORD_LENGTH)
+
+
 def extract_words_from_css(css_content):
     """
     Extract words from CSS content.
@@ -81,36 +92,42 @@ def extract_words_from_css(css_content):
     """
     words = []
 
+    # Split out CSS comments in a single pass; the comment bodies are at odd
+    # indices, with the code between them at even indices
+    parts = _CSS_COMMENT_RE.split(css_content)
+
     # Extract words from CSS comments
-    comments = re.findall(r"\/\*(.*?)\*\/", css_content, re.DOTALL)
-    for comment in comments:
-        words.extend(re.findall(r"[a-zA-Z][a-zA-Z\'\-]*[a-zA-Z\'\-]|[a-zA-Z]", comment))
+    for comment in parts[1::2]:
+        words.extend(_WORD_RE.findall(comment))
 
-    # Remove comments to avoid duplication
-    css_content = re.sub(r"\/\*(.*?)\*\/", " ", css_content, flags=re.DOTALL)
+    # Keep only the code, so comments aren't parsed twice
+    css_content = " ".join(parts[::2])
 
     # Extract CSS property names and values
-    properties = re.findall(r"([a-zA-Z\-]+)\s*:\s*([^;]+);", css_content)
+    properties = _CSS_PROP_RE.findall(css_content)
     for prop, value in properties:
         # Add property name
-        words.extend(re.findall(r"[a-zA-Z][a-zA-Z\'\-]*[a-zA-Z\'\-]|[a-zA-Z]", prop))
+        words.extend(_WORD_RE.findall(prop))
 
-        # Add property values - exclude hex colors and numeric values
+        # Add property values - hex colors and numeric values never match
         # Skip known color values and functions
-        skip_values = ["rgb", "rgba", "hsl", "hsla", "url"]
-        value_words = re.findall(r"[a-zA-Z][a-zA-Z\'\-]*[a-zA-Z\'\-]|[a-zA-Z]", value)
+        value_words = _CSS_VALUE_WORD_RE.findall(value)
         for word in value_words:
-            if word.lower() not in skip_values:
+            if word and word.lower() not in _CSS_SKIP_VALUES:
                 words.append(word)
 
-    # Extract words from selectors
-    selectors = re.findall(r"([.#]?[a-zA-Z][a-zA-Z0-9\-_]*)", css_content)
+    # Extract words from selectors. Hex colors in rule bodies are removed
+    # first, so they aren't read as ID selectors like #fade.
+    css_content = _CSS_RULE_BODY_RE.sub(
+        lambda match: _CSS_HEX_COLOR_RE.sub(" ", match.group(0)), css_content
+    )
+    selectors = _CSS_SELECTOR_RE.findall(css_content)
     for selector in selectors:
         if selector.startswith(".") or selector.startswith("#"):
             selector = selector[1:]  # Remove . or # prefix
 
         # Split by dashes, underscores and camelCase
-        parts = re.findall(r"[a-zA-Z][a-z]*", selector)
+        parts = _CSS_SELECTOR_PART_RE.findall(selector)
         words.extend(parts)
 
     return words